@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# keystroke-to-frame latency benchmarks for the shell and bundled apps
+#
+# drives Shell, Terminal, TextEdit and Calc with recorded key workloads
+# against a fake scutoid module and reports per-key latency, display
+# traffic per key and peak memory. results go to json and can be compared
+# against a stored baseline.
+
+import argparse, importlib.util, json, os, platform, sys, time, tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import fakehw
+
+BASELINE = os.path.join(HERE, "baseline.json")
+
+# metrics where lower is better; timing ones get the loose tolerance,
+# the rest are deterministic and any increase is a regression.
+# max_us is reported but too noisy to gate on. timing changes smaller
+# than FLOOR (in the metric's own unit) are never flagged, a fast key is
+# a fraction of a microsecond and 25% of that is clock jitter.
+TIMED = ("p50_us", "p90_us", "p99_us", "mean_us")
+COUNTED = ("calls_per_key", "bytes_per_key", "peak_kb")
+FLOOR = 1.0
+
+_mods = {}
+
+
+def load(name, rel):
+    # cached so module setup stays out of the latency and memory numbers
+    if name not in _mods:
+        path = os.path.join(ROOT, rel)
+        spec = importlib.util.spec_from_file_location(name, path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        _mods[name] = mod
+    return _mods[name]
+
+
+# -- workloads --
+# each returns (setup, keys) where setup() builds a fresh app and returns
+# a per-key function that does what the app's run loop does for one key
+
+WORDS = ("scutoid", "kernel", "vga", "buffer", "python", "shell", "x86", "boot")
+
+
+def typing(n, width):
+    out, i = [], 0
+    while len(out) < n:
+        line = ""
+        while len(line) < width:
+            line += WORDS[i % len(WORDS)] + " "
+            i += 1
+        out.append(line.rstrip())
+    return out
+
+
+def shell_typing(scale):
+    cmds = []
+    for i, line in enumerate(typing(40 * scale, 50)):
+        cmds.append("echo " + line)
+        if i % 8 == 0:
+            cmds += ["help", "about", "mem", "colors"]
+        if i % 20 == 19:
+            cmds.append("clear")
+    keys = []
+    for c in cmds:
+        # a typo and its fix every so often, like a real burst
+        keys += list(c[:3]) + ['x', '\b'] + list(c[3:]) + ['\n']
+
+    def setup():
+        mod = load("bench_shell", "main.py")
+        return mod.Shell().on_key
+    return setup, keys
+
+
+def terminal_session(scale):
+    cycle = ["ls", "cd /", "ls", "cd Apps", "ls", "pwd", "cd ..",
+             "cd Users/Default", "ls", "uname", "apps", "help",
+             "echo the quick brown fox jumps over the lazy dog", "nope"]
+    keys = []
+    for i in range(30 * scale):
+        for c in cycle:
+            keys += list(c) + ['\n']
+
+    def setup():
+        mod = load("bench_terminal", "programs/Terminal/main.py")
+        return mod.Terminal().on_key
+    return setup, keys
+
+
+def textedit_doc(scale):
+    keys = []
+    for line in typing(120 * scale, 60):
+        keys += list(line) + ['\b', line[-1], '\n']
+
+    def setup():
+        mod = load("bench_textedit", "programs/TextEdit/main.py")
+        ed = mod.TextEdit()
+
+        def key(ch):
+            ed.insert(ch)
+            ed.draw()
+        return key
+    return setup, keys
+
+
+def calc_long(scale):
+    expr = "12345+678*9-3/7=c3.14159*2*2=/0=c9999999*9999999=c"
+    keys = list(expr) * (40 * scale)
+
+    def setup():
+        mod = load("bench_calc", "programs/Calculator/main.py")
+        calc = mod.Calc()
+
+        def key(ch):
+            calc.handle(ch)
+            calc.draw()
+        return key
+    return setup, keys
+
+
+WORKLOADS = {
+    "shell_typing": shell_typing,
+    "terminal_session": terminal_session,
+    "textedit_doc": textedit_doc,
+    "calc_long": calc_long,
+}
+
+
+# -- measurement --
+
+def pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0
+    i = min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+
+def clock_cost(n=2000):
+    """cheapest back-to-back perf_counter_ns() pair, taken off every key"""
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(n):
+        t = clock()
+        d = clock() - t
+        if best is None or d < best:
+            best = d
+    return best
+
+
+def reference(n=5):
+    """fastest of n runs of a fixed pure python loop, in us. compare()
+    scales timings by it, so a machine that is slower across the board
+    (a busy host, a throttled cpu) doesn't read as a regression"""
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(n):
+        t = clock()
+        d, s = {}, ""
+        for i in range(2000):
+            d[i & 63] = s = str(i) + s[:8]
+        t = clock() - t
+        if best is None or t < best:
+            best = t
+    return best / 1000
+
+
+def run_once(hw, setup, keys, cost=0):
+    hw.reset()
+    key = setup()
+    hw.reset()
+    clock = time.perf_counter_ns
+    lat = []
+    for ch in keys:
+        t = clock()
+        key(ch)
+        lat.append(clock() - t)
+    return [max(0, d - cost) for d in lat]
+
+
+def peak_mem(hw, setup, keys):
+    # separate pass so tracemalloc overhead stays out of the latencies
+    tracemalloc.start()
+    try:
+        key = setup()
+        tracemalloc.reset_peak()
+        for ch in keys:
+            key(ch)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summary(best, calls, nbytes, peak):
+    n = len(best)
+    s = sorted(best)
+    return {
+        "keys": n,
+        "p50_us": round(pct(s, 50) / 1000, 2),
+        "p90_us": round(pct(s, 90) / 1000, 2),
+        "p99_us": round(pct(s, 99) / 1000, 2),
+        "max_us": round(s[-1] / 1000, 2),
+        "mean_us": round(sum(s) / n / 1000, 2),
+        "calls_per_key": round(calls / n, 3),
+        "bytes_per_key": round(nbytes / n, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def one_round(names, scale):
+    """child: one warm-up and one timed run of each workload, printed as
+    json with the reference() time"""
+    hw = fakehw.install()
+    loads = {n: WORKLOADS[n](scale) for n in names}
+    for n in names:
+        run_once(hw, *loads[n])
+    cost = clock_cost()
+    lat = {n: run_once(hw, *loads[n], cost) for n in names}
+    print(json.dumps({"lat": lat, "ref": reference()}))
+
+
+def bench(names, scale, repeat):
+    """({name: metrics}, reference us). timings come from `repeat` fresh
+    interpreters, since how fast a process runs the same code varies with
+    its heap and with what the machine is doing at the time. each key
+    keeps its fastest time over all of them. counts and peak memory are
+    exact, so they're taken once, here"""
+    import subprocess
+    best, ref = {}, None
+    for _ in range(repeat):
+        p = subprocess.run([sys.executable, __file__, "--round", str(scale)] + names,
+                           capture_output=True, text=True, check=True)
+        r = json.loads(p.stdout.strip().splitlines()[-1])
+        for n, lat in r["lat"].items():
+            best[n] = list(map(min, best[n], lat)) if n in best else lat
+        ref = r["ref"] if ref is None else min(ref, r["ref"])
+
+    hw = fakehw.install()
+    try:
+        out = {}
+        for n in names:
+            setup, keys = WORKLOADS[n](scale)
+            # warm up, so loading the app and whatever it imports on
+            # first use stays out of the numbers
+            run_once(hw, setup, keys)
+            calls, nbytes = hw.calls, hw.bytes
+            out[n] = summary(best[n], calls, nbytes, peak_mem(hw, setup, keys))
+        return out, round(ref, 1)
+    finally:
+        fakehw.uninstall()
+        _mods.clear()
+
+
+def compare(cur, base, tol, timed=TIMED, counted=COUNTED, noisy=("max_us",),
+            floor=FLOOR, speed=1.0):
+    """print a per-metric diff against base, return the list of regressions.
+    timed metrics in cur are multiplied by speed first"""
+    bad = []
+    for name, res in cur.items():
+        old = base.get(name)
+        if not old:
+            print(f"  {name}: no baseline")
+            continue
+        print(f"  {name}:")
+        for m in timed + noisy + counted:
+            if m not in res or m not in old:
+                continue
+            a, b = old[m], res[m]
+            if m in timed or m in noisy:
+                b = round(b * speed, 2)
+            d = (b - a) / a if a else (0.0 if b == a else 1.0)
+            limit = max(tol * a, floor) if m in timed else 0.0
+            flag = ""
+            if m not in noisy and b - a > limit:
+                flag = "  <-- regression"
+                bad.append(f"{name}.{m}")
+            print(f"    {m:<14} {a:>10} -> {b:>10}  {d * 100:+6.1f}%{flag}")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ScutoidOS keystroke latency benchmarks")
+    ap.add_argument("workloads", nargs="*", help="subset to run (default: all)")
+    ap.add_argument("-o", "--out", help="write results json here")
+    ap.add_argument("-n", "--repeat", type=int, default=5,
+                    help="timed runs, each in a fresh interpreter; fastest time per key kept")
+    ap.add_argument("-s", "--scale", type=int, default=1, help="workload size multiplier")
+    ap.add_argument("-c", "--compare", nargs="?", const=BASELINE, metavar="JSON",
+                    help="compare against a baseline (default bench/baseline.json)")
+    ap.add_argument("--save", nargs="?", const=BASELINE, metavar="JSON",
+                    help="store results as the new baseline")
+    ap.add_argument("-t", "--tolerance", type=float, default=0.25,
+                    help="allowed slowdown for timing metrics (default 0.25)")
+    args = ap.parse_args()
+
+    names = args.workloads or list(WORKLOADS)
+    for n in names:
+        if n not in WORKLOADS:
+            ap.error(f"unknown workload: {n} (have {', '.join(WORKLOADS)})")
+
+    print("ScutoidOS benchmarks")
+    print("=" * 40)
+    results, ref = bench(names, args.scale, args.repeat)
+    for n, r in results.items():
+        print(f"{n:<18} {r['keys']:>6} keys  p50 {r['p50_us']:>8}us  "
+              f"p99 {r['p99_us']:>8}us  {r['calls_per_key']:>7} calls/key  "
+              f"{r['bytes_per_key']:>8} B/key  {r['peak_kb']:>7} KB peak")
+
+    doc = {
+        "meta": {
+            "python": platform.python_version(),
+            "impl": platform.python_implementation(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "reference_us": ref,
+        },
+        "results": results,
+    }
+    for path in (args.out, args.save):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(doc, f, indent=2)
+            print(f"wrote {path}")
+
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                base = json.load(f)
+        except FileNotFoundError:
+            print(f"no baseline at {args.compare}, run with --save first")
+            sys.exit(2)
+        if base.get("meta", {}).get("scale") != args.scale:
+            print("warning: baseline was recorded at a different scale")
+        print(f"\ncompare vs {args.compare}")
+        speed = 1.0
+        old_ref = base.get("meta", {}).get("reference_us")
+        if old_ref:
+            speed = old_ref / ref
+            print(f"reference loop {old_ref}us -> {ref}us, timings scaled by {speed:.2f}")
+        bad = compare(results, base.get("results", {}), args.tolerance, speed=speed)
+        if bad:
+            print(f"\n{len(bad)} regression(s): {', '.join(bad)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--round":
+        one_round(sys.argv[3:], int(sys.argv[2]))
+    else:
+        main()
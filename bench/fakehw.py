@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# fake scutoid module - lets the apps run their HW code paths on the host
+
+import sys
+
+
+class FakeHW:
+    """stands in for the scutoid C module and counts what hits the screen"""
+
+    def __init__(self):
+        self.keys = []
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.bytes = 0
+        self.colors = 0
+        self.clears = 0
+
+    # display
+    def print(self, s):
+        self.calls += 1
+        self.bytes += len(s)
+
+    def clear(self):
+        self.calls += 1
+        self.clears += 1
+
+    def set_color(self, c):
+        self.calls += 1
+        self.colors += 1
+
+    # keyboard
+    def keyboard_available(self):
+        return bool(self.keys)
+
+    def keyboard_read(self):
+        return self.keys.pop(0) if self.keys else 0
+
+    def scancode_to_ascii(self, sc):
+        return chr(sc) if 0 < sc < 128 else None
+
+    # system
+    def halt(self):
+        pass
+
+    def get_stack_pointer(self):
+        return 0x0008FF00
+
+
+def install():
+    """put a FakeHW in sys.modules so `import scutoid` picks it up"""
+    hw = FakeHW()
+    sys.modules['scutoid'] = hw
+    return hw
+
+
+def uninstall():
+    sys.modules.pop('scutoid', None)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# startup time for every entry point: import, first frame, time to prompt
+#
+# each entry runs in a fresh interpreter, a few times over. the child
+# imports the entry (import_ms), then calls its main() until the first
+# frame is up (frame_ms): the first scutoid.halt() for the shell and the
+# apps, the first input() for the installer, a finished image for
+# build_image. wall_ms is the whole process as seen from outside.
+
+import os, sys, time     # kept to the minimum, the child counts what's new
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def entries():
+    """name -> (path relative to ROOT, how to spot the first frame)"""
+    out = {
+        "shell": ("main.py", "hw"),
+        "installer": ("installer/installer.py", "input"),
+        "build_image": ("build_image.py", "build"),
+    }
+    progs = os.path.join(ROOT, "programs")
+    for d in sorted(os.listdir(progs)):
+        if os.path.isfile(os.path.join(progs, d, "main.py")):
+            out[d.lower()] = (f"programs/{d}/main.py", "hw")
+    return out
+
+
+# -- child: runs one entry, prints one line of json --
+
+class FirstFrame(Exception):
+    pass
+
+
+def first_frame(*a, **kw):
+    raise FirstFrame()
+
+
+def child(name):
+    before = set(sys.modules)
+    rel, kind = entries()[name]
+    path = os.path.join(ROOT, rel)
+    sys.path.insert(0, os.path.dirname(path))
+    sys.path.insert(1, ROOT)
+
+    real_out = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    tmp = None
+    if kind == "hw":
+        sys.path.insert(0, HERE)
+        import fakehw
+        before.add("fakehw")
+        fakehw.install().halt = first_frame
+    elif kind == "input":
+        import builtins
+        builtins.input = first_frame
+    elif kind == "build":
+        import tempfile
+        before.update(sys.modules)
+        tmp = tempfile.mkdtemp()
+        sys.argv = [path, os.path.join(ROOT, "bootloader.bin"),
+                    os.path.join(ROOT, "kernel.bin"), os.path.join(tmp, "probe.img")]
+
+    import importlib.util
+    before.update(sys.modules)
+    t1 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("startup_probe", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    t2 = time.perf_counter()
+    try:
+        mod.main()
+    except FirstFrame:
+        pass
+    t3 = time.perf_counter()
+
+    new = sorted(m for m in set(sys.modules) - before if '.' not in m)
+    sys.stdout = real_out
+    if tmp:
+        import shutil
+        shutil.rmtree(tmp, ignore_errors=True)
+    import json
+    print(json.dumps({
+        "import_ms": (t2 - t1) * 1000,
+        "frame_ms": (t3 - t2) * 1000,
+        "modules": len(new),
+        "new": new,
+    }))
+
+
+# -- parent --
+
+def median(vals):
+    s = sorted(vals)
+    return s[len(s) // 2]
+
+
+def measure(name, repeat):
+    import json, subprocess
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        p = subprocess.run([sys.executable, __file__, "--child", name],
+                           capture_output=True, text=True, cwd=ROOT)
+        wall = (time.perf_counter() - t) * 1000
+        if p.returncode:
+            raise RuntimeError(f"{name}: child failed\n{p.stderr}")
+        r = json.loads(p.stdout.strip().splitlines()[-1])
+        r["wall_ms"] = wall
+        runs.append(r)
+    return {
+        # fastest, like bench.py: noise only ever adds time
+        "import_ms": round(min(r["import_ms"] for r in runs), 3),
+        "frame_ms": round(min(r["frame_ms"] for r in runs), 3),
+        "wall_ms": round(median(r["wall_ms"] for r in runs), 2),
+        "modules": runs[0]["modules"],
+        "new": runs[0]["new"],
+    }
+
+
+def main():
+    import argparse, json
+    sys.path.insert(0, HERE)
+    import bench
+
+    baseline = os.path.join(HERE, "startup_baseline.json")
+    ap = argparse.ArgumentParser(description="ScutoidOS startup time")
+    ap.add_argument("names", nargs="*", help="entry points to run (default: all)")
+    ap.add_argument("-n", "--repeat", type=int, default=7, help="runs per entry, fastest kept")
+    ap.add_argument("-o", "--out", help="write results json here")
+    ap.add_argument("-c", "--compare", nargs="?", const=baseline, metavar="JSON",
+                    help="compare against a baseline (default bench/startup_baseline.json)")
+    ap.add_argument("--save", nargs="?", const=baseline, metavar="JSON",
+                    help="store results as the new baseline")
+    ap.add_argument("-t", "--tolerance", type=float, default=0.25)
+    ap.add_argument("-v", "--verbose", action="store_true", help="list modules each entry imports")
+    args = ap.parse_args()
+
+    all_entries = entries()
+    names = args.names or list(all_entries)
+    for n in names:
+        if n not in all_entries:
+            ap.error(f"unknown entry: {n} (have {', '.join(all_entries)})")
+
+    print("ScutoidOS startup")
+    print("=" * 40)
+    results = {}
+    for n in names:
+        r = results[n] = measure(n, args.repeat)
+        print(f"{n:<14} import {r['import_ms']:>7.2f}ms  first frame {r['frame_ms']:>7.2f}ms  "
+              f"process {r['wall_ms']:>7.1f}ms  {r['modules']:>3} modules")
+        if args.verbose and r["new"]:
+            print(f"{'':<14} {' '.join(r['new'])}")
+
+    doc = {"meta": {"python": sys.version.split()[0], "repeat": args.repeat},
+           "results": {n: {k: v for k, v in r.items() if k != "new"}
+                       for n, r in results.items()}}
+    for path in (args.out, args.save):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(doc, f, indent=2)
+            print(f"wrote {path}")
+
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                base = json.load(f)
+        except FileNotFoundError:
+            print(f"no baseline at {args.compare}, run with --save first")
+            sys.exit(2)
+        print(f"\ncompare vs {args.compare}")
+        bad = bench.compare(doc["results"], base.get("results", {}), args.tolerance,
+                            timed=("import_ms", "frame_ms"), counted=("modules",),
+                            noisy=("wall_ms",))
+        if bad:
+            print(f"\n{len(bad)} regression(s): {', '.join(bad)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        main()
@@ -1,7 +1,43 @@
 #!/usr/bin/env python3
 # stitch bootloader + kernel into a bootable floppy image
 
-import struct, sys, os
+import struct, sys, zlib
+
+SECTOR = 512
+FLOPPY = 1474560
+
+# checksum table in the last sector of the image:
+#   "SCTB" | version u8 | count u8 | pad u16
+#   count x (name 8s | offset u32 | length u32 | crc32 u32)
+#   crc32 of everything above
+TRAILER_MAGIC = b"SCTB"
+TRAILER_VER = 1
+TRAILER_HEAD = '<4sBBH'
+TRAILER_ENTRY = '<8sIII'
+
+def pack_trailer(regions):
+    """regions: [(name, offset, length, crc)] -> one sector"""
+    t = struct.pack(TRAILER_HEAD, TRAILER_MAGIC, TRAILER_VER, len(regions), 0)
+    for name, off, length, crc in regions:
+        t += struct.pack(TRAILER_ENTRY, name.encode(), off, length, crc)
+    t += struct.pack('<I', zlib.crc32(t))
+    return t + b'\x00' * (SECTOR - len(t))
+
+def unpack_trailer(sector):
+    """[(name, offset, length, crc)] or None if there's no valid table"""
+    magic, ver, count, _ = struct.unpack_from(TRAILER_HEAD, sector, 0)
+    if magic != TRAILER_MAGIC or ver != TRAILER_VER:
+        return None
+    pos = struct.calcsize(TRAILER_HEAD)
+    end = pos + count * struct.calcsize(TRAILER_ENTRY)
+    if end + 4 > len(sector):
+        return None
+    if struct.unpack_from('<I', sector, end)[0] != zlib.crc32(sector[:end]):
+        return None
+    out = []
+    for name, off, length, crc in struct.iter_unpack(TRAILER_ENTRY, sector[pos:end]):
+        out.append((name.rstrip(b'\x00').decode(), off, length, crc))
+    return out
 
 def build(boot_path, kern_path, out_path):
     print(f"reading bootloader: {boot_path}")
@@ -43,19 +79,30 @@ def build(boot_path, kern_path, out_path):
 
     img = boot + kern
 
-    # pad to 1.44MB floppy
-    floppy = 1474560
-    if len(img) < floppy:
-        img += b'\x00' * (floppy - len(img))
+    # pad to 1.44MB floppy, keeping the last sector for the checksum table
+    body = FLOPPY - SECTOR
+    if len(img) > body:
+        print(f"kernel too big: image needs {len(img)} bytes, floppy has {body}")
+        sys.exit(1)
+    img += b'\x00' * (body - len(img))
+
+    view = memoryview(img)
+    regions = []
+    for name, off, length in (("boot", 0, SECTOR),
+                              ("kernel", SECTOR, len(kern)),
+                              ("pad", SECTOR + len(kern), body - SECTOR - len(kern))):
+        regions.append((name, off, length, zlib.crc32(view[off:off + length])))
+    view.release()
 
     with open(out_path, 'wb') as f:
         f.write(img)
+        f.write(pack_trailer(regions))
 
-    print(f"wrote {out_path} ({len(img)} bytes)")
-    print(f"  boot: 512 bytes, kernel: sectors 1-{sectors}")
+    print(f"wrote {out_path} ({FLOPPY} bytes)")
+    print(f"  boot: 512 bytes, kernel: sectors 1-{sectors}, checksums: sector {FLOPPY // SECTOR - 1}")
     print(f"  qemu-system-i386 -drive format=raw,file={out_path}")
 
-if __name__ == "__main__":
+def main():
     boot = sys.argv[1] if len(sys.argv) > 1 else "bootloader.bin"
     kern = sys.argv[2] if len(sys.argv) > 2 else "kernel.bin"
     out  = sys.argv[3] if len(sys.argv) > 3 else "scutoid.img"
@@ -63,3 +110,6 @@ if __name__ == "__main__":
     print("ScutoidOS image builder")
     print("=" * 40)
     build(boot, kern, out)
+
+if __name__ == "__main__":
+    main()
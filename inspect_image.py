@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# inspect / verify scutoidos disk images
+#
+#   inspect_image.py scutoid.img          sector map + checks
+#   inspect_image.py verify DIR|IMG ...   check checksum tables, many at once
+#
+# images are mmapped and checksummed straight off the mapping through
+# memoryview slices, so nothing gets copied and crc32 (which drops the GIL)
+# can run on several images at once.
+
+import mmap, os, sys, time, zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from build_image import SECTOR, FLOPPY, unpack_trailer
+
+KERNEL_ADDR = 0x10000
+STACK_BOTTOM = 0x8C000      # stack is 0x8C000-0x90000, see README memory layout
+BOOT_LOADS = 18             # sectors bootloader.asm reads (mov al, 18)
+CHUNK = 64 * 1024
+
+_zero_crc = {}
+
+def zero_crc(n):
+    """crc32 of n zero bytes, cached - most images share their pad length"""
+    if n not in _zero_crc:
+        z = bytes(min(n, CHUNK))
+        c = 0
+        left = n
+        while left:
+            k = min(left, CHUNK)
+            c = zlib.crc32(z[:k], c)
+            left -= k
+        _zero_crc[n] = c
+    return _zero_crc[n]
+
+def is_zero(view):
+    return zlib.crc32(view) == zero_crc(len(view))
+
+def data_runs(view, start, end):
+    """[(first_sector, count)] of non-zero sectors in [start, end)"""
+    runs = []
+    run = None
+    pos = start
+    while pos < end:
+        k = min(CHUNK, end - pos)
+        if is_zero(view[pos:pos + k]):
+            run = None
+            pos += k
+            continue
+        for s in range(pos, pos + k, SECTOR):
+            if is_zero(view[s:min(s + SECTOR, end)]):
+                run = None
+            elif run and run[0] + run[1] == s // SECTOR:
+                run[1] += 1
+            else:
+                run = [s // SECTOR, 1]
+                runs.append(run)
+        pos += k
+    return [tuple(r) for r in runs]
+
+def inspect(path):
+    """everything we know about one image, as a dict"""
+    res = {'path': path, 'size': 0, 'regions': [], 'data': [],
+           'trailer': False, 'errors': [], 'warnings': []}
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        res['size'] = size
+        if size < SECTOR:
+            res['errors'].append("smaller than a sector")
+            return res
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                _scan(view, size, res)
+            finally:
+                view.release()
+    return res
+
+def _scan(view, size, res):
+    errs, warns = res['errors'], res['warnings']
+
+    if view[510] | view[511] << 8 != 0xAA55:
+        errs.append(f"bad boot signature 0x{view[510] | view[511] << 8:04X}")
+    if size != FLOPPY:
+        warns.append(f"size {size} is not a 1.44MB floppy")
+
+    table = unpack_trailer(view[size - SECTOR:size]) if size >= 2 * SECTOR else None
+    if table:
+        res['trailer'] = True
+        body = size - SECTOR
+        for name, off, length, crc in table:
+            if off + length > body:
+                errs.append(f"{name}: region runs past the image")
+                continue
+            got = zlib.crc32(view[off:off + length])
+            res['regions'].append((name, off, length, got))
+            if got != crc:
+                errs.append(f"{name}: crc 0x{got:08X}, table says 0x{crc:08X}")
+            if name == "pad" and got != zero_crc(length):
+                res['data'] = data_runs(view, off, off + length)
+        kern = [r for r in res['regions'] if r[0] == "kernel"]
+        kern_len = kern[0][2] if kern else 0
+    else:
+        # no table, take the kernel to be the first run of data after boot
+        body = size
+        runs = data_runs(view, SECTOR, body)
+        kern_len = 0
+        if runs and runs[0][0] == 1:
+            kern_len = runs[0][1] * SECTOR
+            runs = runs[1:]
+        res['data'] = runs
+        pad = SECTOR + kern_len
+        res['regions'] = [("boot", 0, SECTOR, zlib.crc32(view[:SECTOR])),
+                          ("kernel", SECTOR, kern_len,
+                           zlib.crc32(view[SECTOR:pad]))]
+        if body > pad:
+            res['regions'].append(("pad", pad, body - pad, None))
+
+    sectors = (kern_len + SECTOR - 1) // SECTOR
+    res['kernel_sectors'] = sectors
+    end = KERNEL_ADDR + sectors * SECTOR
+    if end > STACK_BOTTOM:
+        errs.append(f"kernel ends at 0x{end:05X}, into the stack at 0x{STACK_BOTTOM:05X}")
+    if sectors > BOOT_LOADS:
+        warns.append(f"kernel is {sectors} sectors, bootloader only loads {BOOT_LOADS}")
+    if not kern_len:
+        errs.append("no kernel")
+
+def show(res):
+    print(f"{res['path']}: {res['size']} bytes, {res['size'] // SECTOR} sectors")
+    print(f"  {'region':<8}{'sectors':>16}{'bytes':>10}  crc32")
+    for name, off, length, crc in res['regions']:
+        first = off // SECTOR
+        last = (off + length - 1) // SECTOR if length else first
+        c = f"0x{crc:08X}" if crc is not None else "-"
+        print(f"  {name:<8}{first:>7} - {last:<6}{length:>10}  {c}")
+    if res['trailer']:
+        n = res['size'] // SECTOR - 1
+        print(f"  {'table':<8}{n:>7} - {n:<6}{SECTOR:>10}")
+    for first, count in res['data']:
+        print(f"  {'data':<8}{first:>7} - {first + count - 1:<6}{count * SECTOR:>10}")
+    ks = res.get('kernel_sectors', 0)
+    if ks:
+        print(f"  kernel loads at 0x{KERNEL_ADDR:05X}-0x{KERNEL_ADDR + ks * SECTOR:05X}"
+              f" (stack at 0x{STACK_BOTTOM:05X})")
+    if not res['trailer']:
+        print("  no checksum table (built before build_image.py wrote one)")
+    for w in res['warnings']:
+        print(f"  warning: {w}")
+    for e in res['errors']:
+        print(f"  error: {e}")
+    if not res['errors']:
+        print("  ok")
+
+def images(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for name in sorted(os.listdir(p)):
+                if name.endswith('.img'):
+                    yield os.path.join(p, name)
+        else:
+            yield p
+
+def verify(paths, jobs=None):
+    files = list(images(paths))
+    if not files:
+        print("no images")
+        return 1
+    t = time.perf_counter()
+    bad = 0
+    total = 0
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 4) as pool:
+        for res in pool.map(_verify_one, files):
+            total += res['size']
+            if not res['trailer']:
+                res['errors'].append("no checksum table")
+            if res['errors']:
+                bad += 1
+                print(f"BAD  {res['path']}: {'; '.join(res['errors'])}")
+    dt = time.perf_counter() - t
+    rate = total / dt / 1e6 if dt else 0
+    print(f"{len(files) - bad}/{len(files)} ok, {total / 1e6:.1f} MB in {dt:.2f}s ({rate:.0f} MB/s)")
+    return 1 if bad else 0
+
+def _verify_one(path):
+    try:
+        return inspect(path)
+    except (OSError, ValueError) as e:
+        return {'path': path, 'size': 0, 'trailer': False, 'errors': [str(e)]}
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "verify":
+        sys.exit(verify(args[1:] or ["."]))
+
+    path = args[0] if args else "scutoid.img"
+    try:
+        res = inspect(path)
+    except OSError as e:
+        print(f"error: {e}")
+        sys.exit(1)
+    show(res)
+    sys.exit(1 if res['errors'] else 0)
@@ -2,9 +2,47 @@
 # ScutoidOS app installer - installs programs from programs/ into Apps/
 
 import os
-import shutil
-import json
-from datetime import datetime
+
+# shutil, json and datetime are imported where they're used - together they
+# pull in ~20 modules, and listing or starting the menu needs none of them
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None    # no advisory locks here, assume we're the only installer
+
+LOCKS = ".locks"
+
+class Lock:
+    """advisory flock on Apps/.locks/<name>.lock, shared or exclusive"""
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self.f = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.f = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self.f, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+        self.f = None
+
+def write_json(path, data):
+    """write to a temp file and rename over path, so readers see old or new"""
+    import json
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 class Installer:
     def __init__(self, base_path="/"):
@@ -12,12 +50,15 @@ class Installer:
         self.apps_dir = os.path.join(base_path, "Apps")
         self.programs_dir = os.path.join(base_path, "programs")
 
+    def setup(self):
+        """create the standard tree, done on first write rather than up front"""
         for d in [self.apps_dir, self.programs_dir,
-                  os.path.join(base_path, "Users"),
-                  os.path.join(base_path, "Other")]:
+                  os.path.join(self.base, "Users"),
+                  os.path.join(self.base, "Other")]:
             os.makedirs(d, exist_ok=True)
 
     def scan_programs(self):
+        import json
         found = []
         if not os.path.exists(self.programs_dir):
             return found
@@ -59,6 +100,13 @@ class Installer:
         print()
         return apps
 
+    def lock(self, name=None, shared=False):
+        """per-app lock, or the global one when name is None.
+        installs hold the global lock shared and their app's lock exclusive;
+        cleanup() holds the global one exclusive"""
+        fname = f"{name}.lock" if name else "apps.lock"
+        return Lock(os.path.join(self.apps_dir, LOCKS, fname), shared)
+
     def install(self, manifest):
         name = manifest['name']
         app_type = manifest.get('type', 'application')
@@ -67,57 +115,78 @@ class Installer:
 
         print(f"\n installing {name}...")
 
-        if os.path.exists(bundle_path):
-            shutil.rmtree(bundle_path)
-
-        os.makedirs(bundle_path, exist_ok=True)
-
-        if app_type == 'standalone':
-            shutil.copy(manifest['path'], bundle_path)
-            main_file = manifest['main']
-        else:
-            src = manifest['path']
-            for item in os.listdir(src):
-                s = os.path.join(src, item)
-                d = os.path.join(bundle_path, item)
-                if os.path.isfile(s):
-                    shutil.copy(s, d)
-                elif os.path.isdir(s):
-                    shutil.copytree(s, d)
-            main_file = manifest.get('main', 'main.py')
-
-        info = {
-            'name': name,
-            'display_name': manifest.get('display_name', name),
-            'identifier': f"org.scutoidos.{name.lower().replace(' ', '')}",
-            'version': manifest.get('version', '1.0.0'),
-            'executable': main_file,
-            'installed': datetime.now().isoformat(),
-            'description': manifest.get('description', ''),
-            'author': manifest.get('author', 'unknown')
-        }
-
-        with open(os.path.join(bundle_path, "info.json"), 'w') as f:
-            json.dump(info, f, indent=2)
+        import shutil
+        from datetime import datetime
+        self.setup()
+        with self.lock(shared=True), self.lock(name):
+            # build the bundle off to the side, then swap it in
+            tmp = os.path.join(self.apps_dir, f".tmp-{name}-{os.getpid()}")
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp)
+            os.makedirs(tmp)
+
+            if app_type == 'standalone':
+                shutil.copy(manifest['path'], tmp)
+                main_file = manifest['main']
+            else:
+                src = manifest['path']
+                for item in os.listdir(src):
+                    s = os.path.join(src, item)
+                    d = os.path.join(tmp, item)
+                    if os.path.isfile(s):
+                        shutil.copy(s, d)
+                    elif os.path.isdir(s):
+                        shutil.copytree(s, d)
+                main_file = manifest.get('main', 'main.py')
+
+            info = {
+                'name': name,
+                'display_name': manifest.get('display_name', name),
+                'identifier': f"org.scutoidos.{name.lower().replace(' ', '')}",
+                'version': manifest.get('version', '1.0.0'),
+                'executable': main_file,
+                'installed': datetime.now().isoformat(),
+                'description': manifest.get('description', ''),
+                'author': manifest.get('author', 'unknown'),
+                'mem_budget': manifest.get('mem_budget')
+            }
+            write_json(os.path.join(tmp, "info.json"), info)
+
+            if os.path.exists(bundle_path):
+                old = os.path.join(self.apps_dir, f".old-{name}-{os.getpid()}")
+                os.rename(bundle_path, old)
+                os.rename(tmp, bundle_path)
+                shutil.rmtree(old)
+            else:
+                os.rename(tmp, bundle_path)
 
         print(f" -> {bundle_path}")
         print(f"    entry: {main_file}")
         return bundle_path
 
-    def list_installed(self):
-        if not os.path.exists(self.apps_dir):
-            print("no apps installed.")
-            return []
-
+    def installed(self):
+        """lock-free read of Apps/. a bundle mid-swap is just skipped,
+        and info.json is only ever replaced whole"""
+        import json
         apps = []
-        for item in os.listdir(self.apps_dir):
+        try:
+            items = sorted(os.listdir(self.apps_dir))
+        except FileNotFoundError:
+            return apps
+        for item in items:
+            if item.startswith('.'):
+                continue
             path = os.path.join(self.apps_dir, item)
-            info_path = os.path.join(path, "info.json")
-            if os.path.isdir(path) and os.path.exists(info_path):
-                with open(info_path, 'r') as f:
+            try:
+                with open(os.path.join(path, "info.json"), 'r') as f:
                     info = json.load(f)
-                    apps.append({'name': info.get('name', item), 'path': path, 'info': info})
+            except (OSError, ValueError):
+                continue
+            apps.append({'name': info.get('name', item), 'path': path, 'info': info})
+        return apps
 
+    def list_installed(self):
+        apps = self.installed()
         if not apps:
             print("no apps installed.")
             return []
@@ -131,13 +200,48 @@ class Installer:
 
     def uninstall(self, name):
         path = os.path.join(self.apps_dir, name)
-        if os.path.exists(path) and os.path.isdir(path):
-            shutil.rmtree(path)
-            print(f"removed {name}")
-            return True
+        if not os.path.isdir(path):
+            print(f"not found: {name}")
+            return False
+        import shutil
+        with self.lock(shared=True), self.lock(name):
+            if os.path.exists(path) and os.path.isdir(path):
+                # .del- not .old-, cleanup() must not bring it back
+                old = os.path.join(self.apps_dir, f".del-{name}-{os.getpid()}")
+                os.rename(path, old)
+                shutil.rmtree(old)
+                print(f"removed {name}")
+                return True
         print(f"not found: {name}")
         return False
 
+    def cleanup(self):
+        """tidy up after installers that died. half-built bundles are
+        removed, and a bundle moved aside for an update is put back if the
+        new one never made it in. returns what was done, a line each"""
+        done = []
+        stale = ('.tmp-', '.old-', '.del-')
+        if not os.path.isdir(self.apps_dir):
+            return done
+        if not any(i.startswith(stale) for i in os.listdir(self.apps_dir)):
+            return done         # usual case: no lock, no shutil
+        import shutil
+        with self.lock():
+            for item in sorted(os.listdir(self.apps_dir)):
+                if not item.startswith(stale):
+                    continue
+                path = os.path.join(self.apps_dir, item)
+                if item.startswith('.old-'):
+                    name = item[5:].rsplit('-', 1)[0]
+                    bundle = os.path.join(self.apps_dir, name)
+                    if not os.path.exists(bundle):
+                        os.rename(path, bundle)
+                        done.append(f"restored {name} from {item}")
+                        continue
+                shutil.rmtree(path, ignore_errors=True)
+                done.append(f"removed {item}")
+        return done
+
     def interactive_install(self):
         apps = self.list_available()
         if not apps:
@@ -164,6 +268,8 @@ def main():
     base = os.path.dirname(here)
 
     inst = Installer(base)
+    for line in inst.cleanup():
+        print(f"cleanup: {line}")
 
     print("ScutoidOS Installer")
     print("=" * 35)
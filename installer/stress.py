@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# hammer the installer from many processes at once and check Apps/ after
+#
+#   python3 installer/stress.py [-w workers] [-r rounds] [-R readers]
+#
+# workers install/uninstall the bundled programs into a scratch tree while
+# reader processes keep listing it. at the end every bundle must match its
+# source, every info.json must parse, and no temp dirs may be left over.
+
+import argparse, filecmp, json, multiprocessing, os, shutil, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from installer import Installer
+
+
+def worker(base, rounds, seed):
+    sys.stdout = open(os.devnull, 'w')
+    inst = Installer(base)
+    apps = inst.scan_programs()
+    done = 0
+    for i in range(rounds):
+        # everyone walks the apps in a different order to maximise overlap
+        for j in range(len(apps)):
+            app = apps[(seed + i + j) % len(apps)]
+            if (seed + i) % 7 == 6:
+                inst.uninstall(app['name'])
+            inst.install(app)
+            done += 1
+    return done
+
+
+def reader(base, stop, out):
+    inst = Installer(base)
+    reads = torn = 0
+    while not stop.is_set():
+        # same walk as Installer.installed(), but a file that doesn't parse
+        # counts as a torn write instead of being skipped
+        for item in os.listdir(inst.apps_dir):
+            if item.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(inst.apps_dir, item, "info.json")) as f:
+                    json.load(f)
+            except OSError:
+                continue        # caught between rename-out and rename-in
+            except ValueError:
+                torn += 1
+            reads += 1
+        inst.installed()
+    out.put((reads, torn))
+
+
+def check(base):
+    inst = Installer(base)
+    problems = []
+    for item in os.listdir(inst.apps_dir):
+        if item.startswith(('.tmp-', '.old-', '.del-')):
+            problems.append(f"leftover {item}")
+    for app in inst.scan_programs():
+        dst = os.path.join(inst.apps_dir, app['name'])
+        try:
+            with open(os.path.join(dst, "info.json")) as f:
+                info = json.load(f)
+        except (OSError, ValueError) as e:
+            problems.append(f"{app['name']}: info.json: {e}")
+            continue
+        if info.get('name') != app['name']:
+            problems.append(f"{app['name']}: info.json names {info.get('name')}")
+        src = app['path']
+        names = [n for n in os.listdir(src) if os.path.isfile(os.path.join(src, n))]
+        match, mismatch, errors = filecmp.cmpfiles(src, dst, names, shallow=False)
+        for n in mismatch + errors:
+            problems.append(f"{app['name']}: {n} differs from source")
+        extra = set(os.listdir(dst)) - set(os.listdir(src)) - {"info.json"}
+        for n in sorted(extra):
+            problems.append(f"{app['name']}: stray {n}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="concurrent installer stress test")
+    ap.add_argument("-w", "--workers", type=int, default=8)
+    ap.add_argument("-r", "--rounds", type=int, default=10)
+    ap.add_argument("-R", "--readers", type=int, default=2)
+    args = ap.parse_args()
+
+    base = tempfile.mkdtemp(prefix="scutoid-stress-")
+    try:
+        shutil.copytree(os.path.join(os.path.dirname(HERE), "programs"),
+                        os.path.join(base, "programs"))
+        Installer(base).setup()
+
+        stop = multiprocessing.Event()
+        out = multiprocessing.Queue()
+        readers = [multiprocessing.Process(target=reader, args=(base, stop, out))
+                   for _ in range(args.readers)]
+        for r in readers:
+            r.start()
+
+        t = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            counts = pool.starmap(worker, [(base, args.rounds, i)
+                                           for i in range(args.workers)])
+        dt = time.perf_counter() - t
+
+        stop.set()
+        reads = torn = 0
+        for r in readers:
+            n, bad = out.get()
+            reads += n
+            torn += bad
+        for r in readers:
+            r.join()
+
+        problems = check(base)
+        if torn:
+            problems.append(f"readers saw {torn} half-written info.json")
+
+        installs = sum(counts)
+        print(f"{args.workers} workers x {args.rounds} rounds: {installs} installs "
+              f"in {dt:.2f}s ({installs / dt:.0f}/s)")
+        print(f"{args.readers} readers: {reads} info.json reads "
+              f"({reads / dt:.0f}/s), {torn} torn")
+        for p in problems:
+            print(f"  FAIL {p}")
+        print("consistent" if not problems else f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
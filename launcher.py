@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# warm-start app launcher
+#
+# apps are resolved through Apps/<name>/info.json (written by the installer)
+# and only read and compiled the first time they're run. loaded namespaces
+# stay in a small LRU, together with their code objects, so a relaunch
+# skips parsing and module setup. when the heap gets tight the least
+# recently used app is dropped first.
+
+import gc, os, sys
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+HOST = sys.implementation.name != "micropython"
+
+if HOST:
+    ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Apps")
+else:
+    ROOT = "/Apps"
+
+LOW_WATER = 4096    # evict until at least this much heap is free
+
+
+def mem_free():
+    try:
+        return gc.mem_free()
+    except AttributeError:
+        return None     # host, no fixed heap
+
+
+class AppCache:
+    def __init__(self, root=ROOT, size=3, keep_code=True):
+        self.root = root
+        self.size = size
+        self.keep_code = keep_code
+        self.entries = {}   # name -> [info, path, code, ns]
+        self.order = []     # least recently used first
+
+    def installed(self):
+        """apps that can actually be run. dot dirs are the installer's
+        half-built or outgoing bundles, and a bundle without its
+        executable (e.g. sde, docs only) can't be run"""
+        try:
+            items = sorted(os.listdir(self.root))
+        except OSError:
+            return []
+        out = []
+        for name in items:
+            if name.startswith('.'):
+                continue
+            try:
+                os.stat(self.resolve(name)[1])
+                out.append(name)
+            except (OSError, ValueError):
+                pass
+        return out
+
+    def resolve(self, name):
+        import json
+        try:
+            with open(f"{self.root}/{name}/info.json") as f:
+                info = json.load(f)
+        except OSError:
+            raise OSError(f"not installed: {name}")
+        return info, f"{self.root}/{name}/{info.get('executable', 'main.py')}"
+
+    def touch(self, name):
+        if name in self.order:
+            self.order.remove(name)
+        self.order.append(name)
+
+    def evict(self, low):
+        """shed the lru app - just its namespace first if we're only
+        short on heap and its code is worth keeping"""
+        name = self.order[0]
+        e = self.entries[name]
+        if low and e[3] is not None and e[2] is not None:
+            e[3] = None
+        else:
+            self.order.pop(0)
+            del self.entries[name]
+        gc.collect()
+        return name
+
+    def drop(self, name):
+        if name in self.order:
+            self.order.remove(name)
+            del self.entries[name]
+
+    def trim(self, keep=None):
+        """evict lru apps while over size or short on heap"""
+        while self.order:
+            free = mem_free()
+            low = free is not None and free < LOW_WATER
+            if len(self.order) <= self.size and not low:
+                break
+            if self.order[0] == keep:
+                if len(self.order) == 1:
+                    break
+                self.touch(keep)
+            self.evict(low)
+
+    def load(self, name):
+        """(ns, info, kind, us) - kind is 'warm' (namespace reused),
+        'code' (cached code re-run) or 'cold' (read and compiled)"""
+        t = ticks_us()
+        e = self.entries.get(name)
+        if e and e[3] is not None:
+            kind = "warm"
+        else:
+            if e and e[2] is not None:
+                kind = "code"
+            else:
+                self.trim()
+                info, path = self.resolve(name)
+                with open(path) as f:
+                    src = f.read()
+                e = [info, path, compile(src, path, "exec"), None]
+                del src
+                kind = "cold"
+            ns = {"__name__": "app_" + name, "__file__": e[1]}
+            exec(e[2], ns)
+            if "main" not in ns:
+                raise ValueError(f"{name} has no main()")
+            e[3] = ns
+            if not self.keep_code:
+                e[2] = None
+            self.entries[name] = e
+        self.touch(name)
+        self.trim(keep=name)
+        return e[3], e[0], kind, ticks_diff(ticks_us(), t)
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # scutoidos main loop - runs after kernel hands off to micropython
-
-import sys
+# (perf, mem and launcher are imported by the commands that need them)
 
 try:
     import scutoid
@@ -13,6 +12,7 @@ class Shell:
     def __init__(self):
         self.running = True
         self.buf = ""
+        self.apps = None
 
     def on_key(self, ch):
         if ch == '\n':
@@ -41,6 +41,12 @@ class Shell:
             if scutoid: scutoid.clear()
         elif cmd == "colors":
             self.show_colors()
+        elif cmd == "apps":
+            self.show_apps()
+        elif cmd == "run" or cmd.startswith("run "):
+            self.run_app(cmd[4:].strip())
+        elif cmd == "perf" or cmd.startswith("perf "):
+            self.do_perf(cmd[5:].strip())
         elif cmd.startswith("echo "):
             if scutoid:
                 scutoid.print(cmd[5:] + "\n")
@@ -64,6 +70,9 @@ class Shell:
             "  clear     - wipe screen",
             "  colors    - palette test",
             "  echo X    - print X",
+            "  apps      - installed apps",
+            "  run X     - start app X",
+            "  perf [on|off|reset|flame]",
             "  shutdown  - halt",
         ]:
             scutoid.print(line + "\n")
@@ -77,6 +86,12 @@ class Shell:
 
     def show_mem(self):
         if not scutoid: return
+        try:
+            import mem
+            for line in mem.report():
+                scutoid.print(line + "\n")
+        except ImportError:
+            pass
         sp = scutoid.get_stack_pointer()
         scutoid.print(f"stack:  0x{sp:08X}\n")
         scutoid.print(f"kernel: 0x00010000\n")
@@ -95,6 +110,93 @@ class Shell:
             scutoid.print(f"  {name}\n")
         scutoid.set_color(0x07)
 
+    def app_cache(self):
+        if self.apps is None:
+            import launcher
+            self.apps = launcher.AppCache()
+        return self.apps
+
+    def show_apps(self):
+        if not scutoid: return
+        cache = self.app_cache()
+        names = cache.installed()
+        if not names:
+            scutoid.print("no apps installed.\n")
+        for name in names:
+            e = cache.entries.get(name)
+            state = "" if not e else (" (warm)" if e[3] is not None else " (cached)")
+            scutoid.print(f"  {name}{state}\n")
+
+    def run_app(self, name):
+        if not scutoid: return
+        if not name:
+            scutoid.print("usage: run <app>\n")
+            return
+        try:
+            ns, info, kind, us = self.app_cache().load(name)
+        except Exception as e:
+            scutoid.set_color(0x0C)
+            scutoid.print(f"run: {e}\n")
+            scutoid.set_color(0x07)
+            return
+
+        # perf is only loaded once someone has used it
+        import sys
+        perf = sys.modules.get("perf")
+        if perf and perf.enabled:
+            perf.enable(ns, *[v for v in ns.values() if isinstance(v, type)])
+        try:
+            try:
+                import mem
+            except ImportError:
+                mem = None
+            if mem:
+                err = mem.launch(name, ns, info.get("mem_budget"))
+            else:
+                ns["main"]()
+                err = None
+        except Exception as e:
+            err = f"{name} crashed: {e}"
+        finally:
+            # the app may have turned perf on itself too
+            perf = sys.modules.get("perf")
+            if perf:
+                perf.release(ns)
+
+        scutoid.clear()
+        if err:
+            # don't keep a namespace the app may have left in a bad state
+            self.apps.drop(name)
+            scutoid.set_color(0x0C)
+            scutoid.print(err + "\n")
+        scutoid.set_color(0x08)
+        scutoid.print(f"{name}: {kind} start {us // 1000}.{us % 1000 // 100}ms\n")
+        scutoid.set_color(0x07)
+        self.apps.trim()
+
+    def do_perf(self, arg):
+        try:
+            import perf
+        except ImportError:
+            if scutoid: scutoid.print("perf not available\n")
+            return
+        lines = []
+        if arg == "on":
+            perf.enable(globals(), Shell)
+        elif arg == "off":
+            perf.disable()
+        elif arg == "reset":
+            perf.reset()
+        elif arg == "flame":
+            lines = perf.flame()
+        elif arg:
+            lines = ["perf [on|off|reset|flame]"]
+        if not lines:
+            lines = perf.report()
+        if not scutoid: return
+        for line in lines:
+            scutoid.print(line + "\n")
+
     def run(self):
         if scutoid:
             scutoid.clear()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# heap accounting and per-app memory budgets
+#
+# on hardware the numbers come straight from the micropython gc - the whole
+# python heap is the fixed 16KB region in the kernel's .bss (see
+# docs/architecture.py). on the host tracemalloc stands in for it, if it's
+# on (python3 -X tracemalloc) - we don't start it ourselves, since tracing
+# slows down everything that runs after it.
+#
+# mem.launch() runs an app's main() with its `scutoid` swapped for a guard
+# that checks the heap on every halt(). over budget means a forced
+# gc.collect(), and if that doesn't get it back under, the app is unwound
+# with OverBudget and the shell carries on.
+
+import gc, sys
+
+HOST = sys.implementation.name != "micropython"
+HEAP = 16 * 1024
+DEFAULT_BUDGET = 4096
+
+apps = {}   # name -> [peak, budget, aborts]
+
+
+class OverBudget(Exception):
+    pass
+
+
+def _tm():
+    """tracemalloc if it's tracing, else None"""
+    import tracemalloc
+    return tracemalloc if tracemalloc.is_tracing() else None
+
+
+def used():
+    if HOST:
+        tm = _tm()
+        return tm.get_traced_memory()[0] if tm else 0
+    return gc.mem_alloc()
+
+
+def free():
+    # the host has no fixed heap to be free of
+    return None if HOST else gc.mem_free()
+
+
+def _owner(path):
+    """app a source file belongs to, None if it isn't under Apps/ or programs/"""
+    parts = path.replace('\\', '/').split('/')
+    for root in ("Apps", "programs"):
+        if root in parts[:-1]:
+            return parts[parts.index(root) + 1]
+    return None
+
+
+def top(n=5):
+    """[(owner, bytes)] biggest first - live allocations by app on the
+    host, peak use per launched app on hardware. a host allocation belongs
+    to the innermost app frame in its traceback, or to (system)"""
+    if not HOST:
+        rows = [(name, rec[0]) for name, rec in apps.items()]
+    elif not _tm():
+        rows = []
+    else:
+        by = {}
+        for st in _tm().take_snapshot().statistics('traceback'):
+            who = "(system)"
+            for fr in reversed(st.traceback):
+                o = _owner(fr.filename)
+                if o:
+                    who = o
+                    break
+            by[who] = by.get(who, 0) + st.size
+        rows = list(by.items())
+    rows.sort(key=lambda r: -r[1])
+    return rows[:n]
+
+
+def report():
+    gc.collect()
+    u, f = used(), free()
+    if f is None and not _tm():
+        out = ["heap:   not tracked (host, run with -X tracemalloc)"]
+    elif f is None:
+        out = [f"heap:   {u} bytes used (host, tracemalloc)"]
+    else:
+        out = [f"heap:   {u} used, {f} free of {u + f}"]
+    for name, rec in apps.items():
+        note = f", {rec[2]} aborted" if rec[2] else ""
+        out.append(f"  {name:<12} peak {rec[0]:>6} / {rec[1]}{note}")
+    rows = top()
+    if rows:
+        out.append("largest:")
+        for who, size in rows:
+            out.append(f"  {who:<20} {size:>8}")
+    return out
+
+
+class _Guard:
+    """scutoid stand-in that checks the budget whenever the app yields"""
+
+    def __init__(self, hw, check):
+        self._hw = hw
+        self._check = check
+
+    def halt(self):
+        self._check()
+        self._hw.halt()
+
+    def __getattr__(self, n):
+        return getattr(self._hw, n)
+
+
+def launch(name, ns, budget=None):
+    """run ns['main']() under a heap budget.
+    returns None if it exited on its own, or why it was stopped"""
+    budget = budget or DEFAULT_BUDGET
+    rec = apps.setdefault(name, [0, budget, 0])
+    rec[1] = budget
+    gc.collect()
+    base = used()
+
+    def check():
+        n = used() - base
+        if n > rec[0]:
+            rec[0] = n
+        if n > budget:
+            gc.collect()
+            n = used() - base
+            if n > budget:
+                raise OverBudget(n)
+
+    hw = ns.get("scutoid")
+    if hw is not None:
+        guard = ns["scutoid"] = _Guard(hw, check)
+    try:
+        ns["main"]()
+        return None
+    except OverBudget as e:
+        rec[2] += 1
+        return f"{name} over budget ({e.args[0]}/{budget} bytes), stopped"
+    except MemoryError:
+        rec[2] += 1
+        return f"{name} ran out of memory, stopped"
+    finally:
+        if hw is not None:
+            # whatever it wraps now, perf may have swapped its proxy out
+            ns["scutoid"] = guard._hw
+        gc.collect()
+        n = used() - base
+        if n > rec[0]:
+            rec[0] = n
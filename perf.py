@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# opt-in hot path counters for scutoidos
+#
+# perf.enable(globals(), Shell) swaps the caller's `scutoid` for a counting
+# proxy and wraps the hot methods (draw/handle/exec/dispatch/on_key) of the
+# given classes. each namespace is tracked on its own, so an app can be
+# instrumented and released again when it exits (perf.release(ns)) without
+# touching the shell's. while disabled nothing is wrapped, so instrumented
+# code runs exactly as before. counters live in fixed-size arrays so turning it
+# on doesn't grow the heap as more functions get hit.
+
+import sys
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+HOST = sys.implementation.name != "micropython"
+
+SLOTS = 32
+MASK = 0xFFFFFFFF
+HOT = ("draw", "handle", "exec", "dispatch", "on_key")
+API = ("print", "clear", "set_color", "keyboard_available",
+       "keyboard_read", "scancode_to_ascii", "halt")
+
+names = []                      # slot -> "Class.method" / "scutoid.fn"
+calls = array('L', [0] * SLOTS)
+times = array('L', [0] * SLOTS)   # cumulative us
+totals = array('L', [0, 0])       # bytes printed, color switches
+enabled = False
+
+_saved = {}       # id(ns) -> [(target, attr, original, wrapper)] to put back
+_depth = [0]      # >0 while inside an instrumented call, for the sampler
+_sampler = None
+
+
+def slot(name):
+    if name in names:
+        return names.index(name)
+    if len(names) < SLOTS - 1:
+        names.append(name)
+        return len(names) - 1
+    # table full, lump the rest together
+    if len(names) < SLOTS:
+        names.append("(other)")
+    return SLOTS - 1
+
+
+def _timed(i, fn):
+    def w(*a, **kw):
+        _depth[0] += 1
+        t = ticks_us()
+        try:
+            return fn(*a, **kw)
+        finally:
+            calls[i] = (calls[i] + 1) & MASK
+            times[i] = (times[i] + ticks_diff(ticks_us(), t)) & MASK
+            _depth[0] -= 1
+    return w
+
+
+class _HW:
+    """counting stand-in for the scutoid module"""
+
+    def __init__(self, hw):
+        self._hw = hw
+        self._color = -1
+        for n in API:
+            if hasattr(hw, n):
+                setattr(self, n, _timed(slot("scutoid." + n), getattr(hw, n)))
+
+        pr = self.print
+        sc = self.set_color
+
+        def print_(s):
+            totals[0] = (totals[0] + len(s)) & MASK
+            pr(s)
+
+        def set_color(c):
+            if c != self._color:
+                self._color = c
+                totals[1] = (totals[1] + 1) & MASK
+            sc(c)
+
+        self.print = print_
+        self.set_color = set_color
+
+    def __getattr__(self, n):
+        return getattr(self._hw, n)
+
+
+def _wrapped(target, attr):
+    for undo in _saved.values():
+        for t, a, orig, w in undo:
+            if t is target and a == attr:
+                return True
+    return False
+
+
+def enable(ns, *classes):
+    """instrument ns['scutoid'] and the hot methods of classes.
+    can be called again to add more, what's already wrapped is left alone"""
+    global enabled, _sampler
+    undo = _saved.setdefault(id(ns), [])
+    hw = ns.get("scutoid")
+    if hw is not None and not _wrapped(ns, "scutoid"):
+        w = _HW(hw)
+        undo.append((ns, "scutoid", hw, w))
+        ns["scutoid"] = w
+    for c in classes:
+        for n in HOT:
+            fn = getattr(c, n, None)
+            if fn is not None and not _wrapped(c, n):
+                w = _timed(slot(c.__name__ + "." + n), fn)
+                undo.append((c, n, fn, w))
+                setattr(c, n, w)
+    if HOST and not (_sampler and _sampler.running):
+        _sampler = Sampler()
+        _sampler.start()
+    enabled = True
+
+
+def _restore(target, attr, orig, w):
+    if not isinstance(target, dict):
+        if getattr(target, attr, None) is w:
+            setattr(target, attr, orig)
+        return
+    cur = target.get(attr)
+    if cur is w:
+        target[attr] = orig
+        return
+    # wrapped again since (mem's guard while an app runs), take the proxy
+    # out from under whatever holds it
+    while cur is not None:
+        inner = getattr(cur, "_hw", None)
+        if inner is w:
+            cur._hw = orig
+            return
+        cur = inner
+
+
+def _release(key):
+    global enabled
+    for target, attr, orig, w in reversed(_saved.pop(key, ())):
+        _restore(target, attr, orig, w)
+    if not _saved:
+        if _sampler:
+            _sampler.stop()
+        enabled = False
+
+
+def release(ns):
+    """undo what enable(ns, ...) did, leaving other namespaces instrumented"""
+    _release(id(ns))
+
+
+def disable():
+    for key in list(_saved):
+        _release(key)
+
+
+def reset():
+    for i in range(SLOTS):
+        calls[i] = 0
+        times[i] = 0
+    totals[0] = totals[1] = 0
+    if _sampler:
+        _sampler.counts.clear()
+
+
+def report():
+    """counter table as a list of lines, slowest first"""
+    out = [f"perf {'on' if enabled else 'off'}"]
+    rows = [(times[i], calls[i], n) for i, n in enumerate(names) if calls[i]]
+    rows.sort(reverse=True)
+    if rows:
+        out.append(f"  {'fn':<24}{'calls':>8}{'us':>10}{'us/call':>9}")
+    for t, c, n in rows:
+        out.append(f"  {n:<24}{c:>8}{t:>10}{t // c:>9}")
+    out.append(f"  printed {totals[0]} bytes, {totals[1]} color switches")
+    return out
+
+
+def flame(path="perf.folded", top=8):
+    """write sampled stacks in folded format, return a short summary"""
+    if not HOST:
+        return ["flame needs the host"]
+    if not _sampler or not _sampler.counts:
+        return ["no samples (perf on, then use the app)"]
+    counts = _sampler.counts
+    with open(path, 'w') as f:
+        for stack, n in counts.items():
+            f.write(f"{stack} {n}\n")
+    total = sum(counts.values())
+    out = [f"{total} samples -> {path}"]
+    for stack, n in sorted(counts.items(), key=lambda kv: -kv[1])[:top]:
+        frames = stack.split(";")
+        tail = ";".join(frames[-3:])
+        out.append(f"  {n * 100 // total:>3}% {tail}")
+    return out
+
+
+class Sampler:
+    """host only: samples the main thread's stack while it's in a hot call"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.counts = {}
+        self.running = False
+
+    def start(self):
+        import threading
+        self.tid = threading.get_ident()
+        self.running = True
+        t = threading.Thread(target=self._loop, daemon=True)
+        t.start()
+
+    def stop(self):
+        self.running = False
+
+    def _loop(self):
+        import time
+        wrap = _timed(0, None).__code__
+        while self.running:
+            time.sleep(self.interval)
+            if not _depth[0]:
+                continue
+            f = sys._current_frames().get(self.tid)
+            stack = []
+            while f is not None:
+                code = f.f_code
+                if code is not wrap:
+                    stack.append(getattr(code, "co_qualname", code.co_name))
+                f = f.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
@@ -7,7 +7,153 @@ try:
 except ImportError:
     HW = False
 
-import os
+COLS, ROWS = 80, 25
+SCROLLBACK = 32     # lines kept, at least ROWS. costs COLS + 2 + 2 * RUNS bytes each
+RUNS = 4            # color changes kept per line, later ones take the last color
+
+# scancodes
+SHIFT_DOWN = (0x2A, 0x36)
+SHIFT_UP = (0xAA, 0xB6)
+PGUP, PGDN = 0x49, 0x51
+
+
+class _Quit(Exception):
+    """q at the more prompt, unwinds the command being paged"""
+
+
+class Scrollback:
+    """fixed ring of screen lines, one char byte per cell and a few
+    (column, color) runs per line. allocated once up front so a long
+    session never grows the heap"""
+
+    def __init__(self, lines=SCROLLBACK):
+        self.cap = lines
+        self.chars = bytearray(lines * COLS)
+        self.lens = bytearray(lines)
+        self.runs = bytearray(lines * RUNS * 2)
+        self.nruns = bytearray(lines)
+        self.top = 0        # ring slot of the oldest line
+        self.count = 1      # lines held, the last one is being written
+        self.total = 1      # lines ever started, for absolute line numbers
+
+    def slot(self, i):
+        return (self.top + i) % self.cap
+
+    def first(self):
+        """absolute number of the oldest line still held"""
+        return self.total - self.count
+
+    def newline(self):
+        if self.count == self.cap:
+            self.top = (self.top + 1) % self.cap
+        else:
+            self.count += 1
+        self.total += 1
+        r = self.slot(self.count - 1)
+        self.lens[r] = 0
+        self.nruns[r] = 0
+
+    def mark(self, r, n, attr):
+        """line slot r is in color attr from column n on"""
+        k = self.nruns[r]
+        o = r * RUNS * 2
+        if k and self.runs[o + 2 * k - 1] == attr:
+            return
+        if k and self.runs[o + 2 * k - 2] == n:
+            k -= 1          # nothing was written in the old color
+        elif k == RUNS:
+            return
+        self.runs[o + 2 * k] = n
+        self.runs[o + 2 * k + 1] = attr
+        self.nruns[r] = k + 1
+
+    def back(self, r):
+        """drop the last cell of line slot r"""
+        n = self.lens[r]
+        if not n:
+            return
+        n -= 1
+        self.lens[r] = n
+        k = self.nruns[r]
+        while k and self.runs[r * RUNS * 2 + 2 * k - 2] >= n:
+            k -= 1
+        self.nruns[r] = k
+
+    def write(self, text, attr):
+        if len(text) == 1 and text not in '\n\b':
+            # typed char echo, the common case
+            r = self.slot(self.count - 1)
+            n = self.lens[r]
+            if n < COLS:
+                c = ord(text)
+                self.chars[r * COLS + n] = c if c < 128 else 63     # '?'
+                self.mark(r, n, attr)
+                self.lens[r] = n + 1
+                return
+        for i, seg in enumerate(text.split('\n')):
+            if i:
+                self.newline()
+            if seg:
+                self.put(seg, attr)
+
+    def put(self, seg, attr):
+        r = self.slot(self.count - 1)
+        n = self.lens[r]
+        if '\b' in seg:
+            for ch in seg:
+                if ch == '\b':
+                    self.back(self.slot(self.count - 1))
+                else:
+                    self.put(ch, attr)
+            return
+        b = seg.encode()
+        if len(b) != len(seg):
+            # non-ascii, one '?' per char so cells stay one byte each
+            b = bytes(ord(ch) if ord(ch) < 128 else 63 for ch in seg)
+        while b:
+            if n == COLS:
+                self.newline()
+                r = self.slot(self.count - 1)
+                n = 0
+            k = min(COLS - n, len(b))
+            o = r * COLS + n
+            self.chars[o:o + k] = b[:k]
+            self.mark(r, n, attr)
+            n += k
+            self.lens[r] = n
+            b = b[k:]
+
+    def render(self, start, rows):
+        """draw absolute lines [start, start + rows), nothing else.
+        leaves the color at 0x07"""
+        first = self.first()
+        cur = None
+        start = max(start, first)
+        end = min(start + rows, first + self.count)
+        for ln in range(start, end):
+            r = self.slot(ln - first)
+            o = r * COLS
+            n = self.lens[r]
+            tail = "\n" if ln < end - 1 else ""
+            if not HW:
+                print(bytes(self.chars[o:o + n]).decode('ascii', 'replace') + tail, end='')
+                continue
+            # one print per color run
+            ro = r * RUNS * 2
+            k = self.nruns[r]
+            for i in range(k):
+                a = self.runs[ro + 2 * i + 1]
+                s = self.runs[ro + 2 * i]
+                e = self.runs[ro + 2 * i + 2] if i + 1 < k else n
+                if a != cur:
+                    scutoid.set_color(a)
+                    cur = a
+                scutoid.print(bytes(self.chars[o + s:o + min(e, n)]).decode('ascii', 'replace'))
+            if tail:
+                scutoid.print(tail)
+        if HW and cur != 0x07:
+            scutoid.set_color(0x07)
+
 
 class Terminal:
     def __init__(self):
@@ -15,23 +161,95 @@ class Terminal:
         self.history = []
         self.running = True
         self.cwd = "/Users/Default"
+        self.sb = Scrollback()
+        self.scroll = 0         # lines scrolled back from the live view
+        self.shift = False
+        self.more_at = None     # first line of the current page while paging
+        self.attr = None        # color last set on screen, None if unknown
 
-    def prompt(self):
+    def put(self, text, attr=0x07):
+        if self.more_at is not None:
+            i = text.find('\n') + 1
+            if 0 < i < len(text):
+                # a line at a time so the pager can stop between them
+                self.put(text[:i], attr)
+                self.put(text[i:], attr)
+                return
+            if self.sb.total - 1 - self.more_at >= ROWS - 1:
+                self.more_wait()
+        self.sb.write(text, attr)
         if HW:
-            scutoid.set_color(0x0A)
-            scutoid.print(self.cwd + " ")
-            scutoid.set_color(0x07)
-            scutoid.print("$ ")
-        else:
-            print(f"{self.cwd} $ ", end='')
-
-    def out(self, text):
-        if HW:
-            scutoid.set_color(0x07)
+            if attr != self.attr:
+                scutoid.set_color(attr)
+                self.attr = attr
             scutoid.print(text)
         else:
             print(text, end='')
 
+    def prompt(self):
+        self.put(self.cwd + " ", 0x0A)
+        self.put("$ ")
+
+    def out(self, text):
+        self.put(text)
+
+    def redraw(self):
+        sb = self.sb
+        end = sb.total - self.scroll
+        if HW: scutoid.clear()
+        sb.render(end - ROWS, ROWS)
+        self.attr = 0x07
+
+    def page(self, n):
+        held = self.sb.count - ROWS
+        self.scroll = max(0, min(self.scroll + n, held if held > 0 else 0))
+        self.redraw()
+
+    def more(self, raw):
+        """run a command, stopping for a key every screenful of output"""
+        if not raw:
+            self.out("usage: more <command>\n")
+            return
+        self.more_at = self.sb.total - 1
+        try:
+            self.exec(raw)
+        except _Quit:
+            pass
+        finally:
+            self.more_at = None
+
+    def more_wait(self):
+        """screen is full: wait for space (next page), enter (next line) or q"""
+        if not HW:
+            if input("-- more --").strip().lower() == 'q':
+                raise _Quit()
+            self.more_at = self.sb.total - 1
+            return
+        scutoid.set_color(0x70)
+        scutoid.print("-- more space/enter/q --")
+        scutoid.set_color(0x07)
+        self.attr = 0x07
+        ch = None
+        while ch not in (' ', '\n', 'q', 'Q'):
+            scutoid.halt()
+            if not scutoid.keyboard_available():
+                continue
+            sc = scutoid.keyboard_read()
+            if sc in SHIFT_DOWN or sc in SHIFT_UP:
+                self.shift = sc in SHIFT_DOWN
+            elif sc < 128:
+                ch = scutoid.scancode_to_ascii(sc)
+        if ch in ('q', 'Q'):
+            scutoid.print("\n")
+            raise _Quit()
+        # the next page starts on a clear screen, enter keeps all but one line
+        keep = ROWS - 2 if ch == '\n' else 0
+        scutoid.clear()
+        self.sb.render(self.sb.total - 1 - keep, keep)
+        if keep:
+            scutoid.print("\n")
+        self.more_at = self.sb.total - 1 - keep
+
     def exec(self, raw):
         parts = raw.strip().split()
         if not parts: return
@@ -40,10 +258,13 @@ class Terminal:
         args = parts[1:]
 
         if cmd == "help":
-            self.out("  help, clear, ls, cd, pwd, echo, uname, apps, exit\n")
+            self.out("  help, clear, ls, cd, pwd, echo, uname, apps, perf, more, exit\n")
+            self.out("  shift+pgup/pgdn scrolls back\n")
         elif cmd in ("clear", "cls"):
             if HW: scutoid.clear()
-            else: os.system('clear' if os.name == 'posix' else 'cls')
+            else:
+                import os
+                os.system('clear' if os.name == 'posix' else 'cls')
         elif cmd == "ls":
             self.do_ls()
         elif cmd == "cd":
@@ -55,8 +276,11 @@ class Terminal:
         elif cmd == "uname":
             self.out("ScutoidOS 0.1 (x86)\n")
         elif cmd == "apps":
-            for a in ["TextEdit.sce", "Calculator.sce", "Terminal.sce"]:
-                self.out(f"  {a}\n")
+            self.do_apps()
+        elif cmd == "perf":
+            self.do_perf(args)
+        elif cmd == "more":
+            self.more(raw.strip()[len(parts[0]):].strip())
         elif cmd in ("exit", "quit"):
             self.running = False
         else:
@@ -66,7 +290,7 @@ class Terminal:
         if self.cwd == "/":
             items = ["Users/", "Apps/", "Other/", "programs/"]
         elif self.cwd == "/Apps":
-            items = ["TextEdit.sce/", "Calculator.sce/", "Terminal.sce/"]
+            items = [a + "/" for a in self.installed() or ()] or ["(empty)"]
         elif "Users" in self.cwd:
             items = ["Documents/", "Downloads/", "Desktop/"]
         else:
@@ -74,6 +298,23 @@ class Terminal:
         for i in items:
             self.out(f"{i}\n")
 
+    def installed(self):
+        """runnable apps as the shell sees them, None without a launcher"""
+        try:
+            import launcher
+        except ImportError:
+            return None
+        return launcher.AppCache().installed()
+
+    def do_apps(self):
+        names = self.installed()
+        if names is None:
+            self.out("apps not available\n")
+        elif not names:
+            self.out("no apps installed.\n")
+        for a in names or ():
+            self.out(f"  {a}\n")
+
     def do_cd(self, args):
         if not args:
             self.cwd = "/Users/Default"
@@ -87,10 +328,51 @@ class Terminal:
         else:
             self.cwd = f"{self.cwd}/{args[0]}".replace('//', '/')
 
+    def do_perf(self, args):
+        try:
+            import perf
+        except ImportError:
+            self.out("perf not available\n")
+            return
+        arg = args[0].lower() if args else ""
+        lines = []
+        if arg == "on":
+            perf.enable(globals(), Terminal)
+        elif arg == "off":
+            perf.disable()
+        elif arg == "reset":
+            perf.reset()
+        elif arg == "flame":
+            lines = perf.flame()
+        elif arg:
+            lines = ["perf [on|off|reset|flame]"]
+        for line in lines or perf.report():
+            self.out(line + "\n")
+
+    def on_scan(self, sc):
+        if sc in SHIFT_DOWN:
+            self.shift = True
+        elif sc in SHIFT_UP:
+            self.shift = False
+        elif sc >= 128:
+            pass
+        elif self.shift and sc == PGUP:
+            self.page(ROWS - 1)
+        elif self.shift and sc == PGDN:
+            self.page(-(ROWS - 1))
+        else:
+            ch = scutoid.scancode_to_ascii(sc)
+            if not ch:
+                return
+            if self.scroll:
+                # typing snaps back to the live view
+                self.scroll = 0
+                self.redraw()
+            self.on_key(ch)
+
     def on_key(self, ch):
         if ch == '\n':
-            if HW: scutoid.print("\n")
-            else: print()
+            self.put("\n")
             if self.buf:
                 self.history.append(self.buf)
                 self.exec(self.buf)
@@ -101,19 +383,16 @@ class Terminal:
             if self.buf:
                 self.buf = self.buf[:-1]
                 if HW:
-                    scutoid.print("\b \b")
+                    self.put("\b \b")
         else:
             self.buf += ch
-            if HW: scutoid.print(ch)
-            else: print(ch, end='', flush=True)
+            self.put(ch)
 
     def run(self):
         if HW:
             scutoid.clear()
-            scutoid.set_color(0x0B)
-            scutoid.print("ScutoidOS Terminal\n")
-            scutoid.set_color(0x07)
-            scutoid.print("type 'help'\n\n")
+            self.put("ScutoidOS Terminal\n", 0x0B)
+            self.put("type 'help'\n\n")
         else:
             print("ScutoidOS Terminal (test mode)")
             print("type 'help'\n")
@@ -124,6 +403,7 @@ class Terminal:
             while self.running:
                 try:
                     cmd = input()
+                    self.sb.write(cmd + "\n", 0x07)
                     self.exec(cmd)
                     if self.running: self.prompt()
                 except (KeyboardInterrupt, EOFError):
@@ -131,10 +411,7 @@ class Terminal:
         else:
             while self.running:
                 if scutoid.keyboard_available():
-                    sc = scutoid.keyboard_read()
-                    if sc < 128:
-                        ch = scutoid.scancode_to_ascii(sc)
-                        if ch: self.on_key(ch)
+                    self.on_scan(scutoid.keyboard_read())
                 scutoid.halt()
 
 def main():
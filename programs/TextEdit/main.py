@@ -7,11 +7,99 @@ try:
 except ImportError:
     HW = False
 
+UNDO_CAP = 1024     # bytes of undo history, oldest edits dropped first
+
+# left ctrl make/break scancodes
+CTRL_DOWN, CTRL_UP = 0x1D, 0x9D
+
+# undo record kinds
+INS, DEL, NL = 1, 2, 3
+
+class UndoLog:
+    """edits as packed deltas in a bytearray, newest last:
+        kind | line u16 | col u16 | n | text (n bytes) | n
+    the trailing n lets us walk back from the end. typing (or backspacing)
+    along one line grows the last record instead of adding one"""
+
+    def __init__(self, cap=UNDO_CAP):
+        self.cap = cap
+        self.undo = bytearray()
+        self.redo = bytearray()
+        self.sealed = False
+
+    def seal(self):
+        # next edit starts a new record
+        self.sealed = True
+
+    def push(self, kind, line, col, text):
+        b = text.encode()
+        del self.redo[:]
+        if not self.merge(kind, line, col, b):
+            self.append(self.undo, kind, line, col, b)
+        self.sealed = False
+        # drop whole records off the front until we fit
+        drop = 0
+        while len(self.undo) - drop > self.cap:
+            drop += 7 + self.undo[drop + 5]
+        if drop:
+            del self.undo[:drop]
+
+    def append(self, buf, kind, line, col, b):
+        n = len(b)
+        buf.extend(bytes((kind, line >> 8, line & 0xFF, col >> 8, col & 0xFF, n)))
+        buf.extend(b)
+        buf.append(n)
+
+    def last(self, buf):
+        n = buf[-1]
+        at = len(buf) - 7 - n
+        return at, buf[at], buf[at + 1] << 8 | buf[at + 2], buf[at + 3] << 8 | buf[at + 4], n
+
+    def merge(self, kind, line, col, b):
+        buf = self.undo
+        if not buf or self.sealed or kind == NL:
+            return False
+        at, k, ln, c, n = self.last(buf)
+        m = n + len(b)
+        if k != kind or ln != line or m > 255:
+            return False
+        if kind == INS and col == c + n:
+            buf[-1:] = b
+            buf.append(m)
+        elif kind == DEL and col + len(b) == c:
+            buf[at + 6:at + 6] = b
+            buf[at + 3] = col >> 8
+            buf[at + 4] = col & 0xFF
+            buf[-1] = m
+        else:
+            return False
+        buf[at + 5] = m
+        return True
+
+    def pop(self, buf):
+        """newest record off buf as (kind, line, col, text), or None"""
+        if not buf:
+            return None
+        at, k, ln, c, n = self.last(buf)
+        text = bytes(buf[at + 6:at + 6 + n]).decode()
+        del buf[at:]
+        return k, ln, c, text
+
+    def step(self, src, dst):
+        rec = self.pop(src)
+        if rec:
+            k, ln, c, text = rec
+            self.append(dst, k, ln, c, text.encode())
+        self.sealed = True
+        return rec
+
 class TextEdit:
-    def __init__(self):
+    def __init__(self, undo_cap=UNDO_CAP):
         self.lines = []
         self.cur = 0
         self.fname = "untitled.txt"
+        self.log = UndoLog(undo_cap)
+        self.ctrl = False
 
     def draw(self):
         if HW:
@@ -27,7 +115,7 @@ class TextEdit:
             scutoid.set_color(0x08)
             scutoid.print("-" * 50 + "\n")
             scutoid.set_color(0x0B)
-            scutoid.print("ctrl+s save | ctrl+q quit\n")
+            scutoid.print("ctrl+s save | ctrl+z undo | ctrl+y redo | ctrl+q quit\n")
         else:
             print(f"\n-- {self.fname} --")
             for i, line in enumerate(self.lines):
@@ -41,12 +129,46 @@ class TextEdit:
         if ch == '\n':
             self.cur += 1
             self.lines.insert(self.cur, "")
+            self.log.push(NL, self.cur, 0, "")
         elif ch == '\b':
-            if self.lines[self.cur]:
-                self.lines[self.cur] = self.lines[self.cur][:-1]
+            line = self.lines[self.cur]
+            if line:
+                self.lines[self.cur] = line[:-1]
+                self.log.push(DEL, self.cur, len(line) - 1, line[-1])
         else:
+            self.log.push(INS, self.cur, len(self.lines[self.cur]), ch)
             self.lines[self.cur] += ch
 
+    def apply(self, rec, forward):
+        # replay a record (redo) or its inverse (undo)
+        kind, ln, col, text = rec
+        if kind == NL:
+            if forward:
+                self.lines.insert(ln, "")
+                self.cur = ln
+            else:
+                del self.lines[ln]
+                self.cur = ln - 1
+            return
+        line = self.lines[ln]
+        if (kind == INS) == forward:
+            self.lines[ln] = line[:col] + text + line[col:]
+        else:
+            self.lines[ln] = line[:col] + line[col + len(text):]
+        self.cur = ln
+
+    def undo(self):
+        rec = self.log.step(self.log.undo, self.log.redo)
+        if rec:
+            self.apply(rec, False)
+        return rec is not None
+
+    def redo(self):
+        rec = self.log.step(self.log.redo, self.log.undo)
+        if rec:
+            self.apply(rec, True)
+        return rec is not None
+
     def save(self):
         if HW:
             scutoid.set_color(0x0A)
@@ -68,8 +190,19 @@ class TextEdit:
                 sc = scutoid.keyboard_read()
                 if sc == 0x1F:    # ctrl+s
                     self.save()
+                    self.log.seal()
                 elif sc == 0x10:  # ctrl+q
                     return
+                elif sc == CTRL_DOWN:
+                    self.ctrl = True
+                elif sc == CTRL_UP:
+                    self.ctrl = False
+                elif self.ctrl and sc == 0x2C:  # ctrl+z
+                    if self.undo():
+                        self.draw()
+                elif self.ctrl and sc == 0x15:  # ctrl+y
+                    if self.redo():
+                        self.draw()
                 else:
                     ch = scutoid.scancode_to_ascii(sc)
                     if ch: